@@ -0,0 +1,46 @@
+"""
+Message Batches
+
+Runs the transcript analysis stage for many episodes at once through the
+Anthropic Message Batches API, which costs half as much as individual
+requests in exchange for asynchronous completion.
+"""
+
+import anthropic
+import asyncio
+import logging
+import os
+
+from .transcript_analyzer.graph import analysis_batch_params, parse_analysis_message
+
+
+BATCH_POLL_INTERVAL = int(os.getenv("BATCH_POLL_INTERVAL", "30"))
+
+logger = logging.getLogger(__name__)
+
+
+async def run_analysis_batch(transcripts: dict[str, str]) -> dict[str, dict]:
+    """Analyze transcripts keyed by custom ID, returning results for those that succeeded."""
+    client = anthropic.AsyncAnthropic()
+    batch = await client.messages.batches.create(requests=[
+        {"custom_id": custom_id, "params": analysis_batch_params(transcript_content)}
+        for custom_id, transcript_content in transcripts.items()
+    ])
+    # Logged so results can still be retrieved by hand if the server restarts mid-batch
+    logger.info("Submitted analysis batch %s for threads %s", batch.id, list(transcripts))
+
+    while batch.processing_status != "ended":
+        await asyncio.sleep(BATCH_POLL_INTERVAL)
+        batch = await client.messages.batches.retrieve(batch.id)
+
+    results = {}
+    async for entry in await client.messages.batches.results(batch.id):
+        if entry.result.type != "succeeded":
+            logger.warning(
+                "Batch %s request %s %s", batch.id, entry.custom_id, entry.result.type
+            )
+            continue
+        analysis = parse_analysis_message(entry.result.message)
+        if analysis is not None:
+            results[entry.custom_id] = analysis
+    return results
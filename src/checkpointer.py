@@ -0,0 +1,189 @@
+"""
+Queued Postgres Checkpointer
+
+Wraps AsyncPostgresSaver so checkpoint writes happen in the background
+instead of blocking node transitions on a database round trip.
+"""
+
+from typing import Any, AsyncIterator, Sequence
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class QueuedSaver(AsyncPostgresSaver):
+    """Postgres checkpointer with a coalescing background writer.
+
+    Each thread has a single pending slot holding its latest unsaved checkpoint
+    and the task writes queued behind it. If a newer checkpoint arrives while
+    the previous write is still in flight, the unwritten one is replaced, along
+    with any writes recorded against it, and the newer one takes over its
+    parent. Reads flush the thread's pending writes first, so state lookups
+    and resumes always see its latest checkpoint without waiting on other
+    threads.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._pending: dict[tuple[str, str], dict] = {}
+        self._writers: dict[tuple[str, str], asyncio.Task] = {}
+        # Per thread, the last checkpoint that failed to save and the config
+        # pointing at its parent, so its child can link past it
+        self._lost: dict[tuple[str, str], tuple[str, RunnableConfig]] = {}
+
+    @staticmethod
+    def _key(config: RunnableConfig) -> tuple[str, str]:
+        configurable = config["configurable"]
+        return configurable["thread_id"], configurable.get("checkpoint_ns", "")
+
+    def _slot(self, key: tuple[str, str]) -> dict:
+        return self._pending.setdefault(key, {"checkpoint": None, "writes": []})
+
+    def _schedule(self, key: tuple[str, str]) -> None:
+        if key not in self._writers:
+            self._writers[key] = asyncio.create_task(self._write_latest(key))
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        key = self._key(config)
+        slot = self._slot(key)
+
+        if (replaced := slot["checkpoint"]) is not None:
+            replaced_id = replaced[1]["id"]
+            # The replaced checkpoint is never saved, so link to its parent instead
+            if config["configurable"].get("checkpoint_id") == replaced_id:
+                config = replaced[0]
+            # Channels bumped only by the dropped checkpoint still need their blobs
+            new_versions = {**replaced[3], **new_versions}
+            slot["writes"] = [
+                write for write in slot["writes"]
+                if write[0]["configurable"]["checkpoint_id"] != replaced_id
+            ]
+        slot["checkpoint"] = (config, checkpoint, metadata, new_versions)
+        self._schedule(key)
+
+        return {
+            "configurable": {
+                "thread_id": key[0],
+                "checkpoint_ns": key[1],
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        key = self._key(config)
+        self._slot(key)["writes"].append((config, writes, task_id, task_path))
+        self._schedule(key)
+
+    async def _write_latest(self, key: tuple[str, str]) -> None:
+        """Drain the pending slot for a thread until no newer checkpoint arrives."""
+        # Only one writer runs per thread, so its writes stay in order without
+        # a lock; the base saver serializes access to a shared connection
+        try:
+            while (slot := self._pending.pop(key, None)) is not None:
+                await self._write_slot(key, slot)
+        finally:
+            del self._writers[key]
+            # Anything still queued (e.g. after a cancelled drain) needs a new writer
+            if key in self._pending:
+                self._schedule(key)
+
+    async def _write_slot(self, key: tuple[str, str], slot: dict) -> None:
+        """Persist one slot, logging failures so later checkpoints still get written."""
+        checkpoint_id = slot["checkpoint"][1]["id"] if slot["checkpoint"] else None
+
+        # Writes for earlier checkpoints go first, while a lost parent is still known
+        await self._write_writes(key, [
+            write for write in slot["writes"]
+            if write[0]["configurable"]["checkpoint_id"] != checkpoint_id
+        ])
+
+        if slot["checkpoint"] is not None:
+            config, checkpoint, metadata, new_versions = slot["checkpoint"]
+            lost = self._lost.get(key)
+            if lost and config["configurable"].get("checkpoint_id") == lost[0]:
+                config = lost[1]
+            try:
+                await super().aput(config, checkpoint, metadata, new_versions)
+            except Exception:
+                logger.exception(
+                    "Failed to save checkpoint %s for thread %s", checkpoint_id, key[0]
+                )
+                self._lost[key] = (checkpoint_id, config)
+            else:
+                self._lost.pop(key, None)
+
+            await self._write_writes(key, [
+                write for write in slot["writes"]
+                if write[0]["configurable"]["checkpoint_id"] == checkpoint_id
+            ])
+
+    async def _write_writes(self, key: tuple[str, str], writes: list[tuple]) -> None:
+        lost = self._lost.get(key)
+        for config, task_writes, task_id, task_path in writes:
+            # Writes for a checkpoint that never saved would point at nothing
+            if lost and config["configurable"]["checkpoint_id"] == lost[0]:
+                continue
+            try:
+                await super().aput_writes(config, task_writes, task_id, task_path)
+            except Exception:
+                logger.exception("Failed to save writes for thread %s", key[0])
+
+    async def flush(self, thread_id: str | None = None) -> None:
+        """Wait for queued checkpoint writes to reach the database.
+
+        Flushes only the given thread when thread_id is set, otherwise every thread.
+        """
+        keys = [
+            key for key in {*self._pending, *self._writers}
+            if thread_id is None or key[0] == thread_id
+        ]
+        for key in keys:
+            if key in self._pending:
+                self._schedule(key)
+        writers = [self._writers[key] for key in keys if key in self._writers]
+        if writers:
+            await asyncio.gather(*writers)
+
+        # Once flushed, nothing queued can still point at a checkpoint that failed
+        for key in [key for key in self._lost if thread_id is None or key[0] == thread_id]:
+            if key not in self._pending:
+                del self._lost[key]
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        await self.flush(config["configurable"]["thread_id"])
+        return await super().aget_tuple(config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        **kwargs: Any,
+    ) -> AsyncIterator[CheckpointTuple]:
+        # Listing without a thread (e.g. alist(None)) flushes every thread
+        await self.flush((config or {}).get("configurable", {}).get("thread_id"))
+        async for checkpoint_tuple in super().alist(config, **kwargs):
+            yield checkpoint_tuple
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self.flush(thread_id)
+        await super().adelete_thread(thread_id)
@@ -7,17 +7,24 @@ podcast transcripts into marketing packages with human-in-the-loop title selecti
 
 from typing import TypedDict, Literal, Annotated
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import MemorySaver
-from langgraph.types import interrupt, Command
-from langchain_anthropic import ChatAnthropic
+from langgraph.types import interrupt, Command, Send
 from langchain_core.messages import HumanMessage, SystemMessage
-import json
+import functools
+import operator
+import orjson
 import os
 
 # Import subagent graphs
-from ..transcript_analyzer.graph import graph as transcript_analyzer_graph
-from ..trend_researcher.graph import graph as trend_researcher_graph
-from ..titling_agent.graph import graph as titling_agent_graph
+from ..transcript_analyzer.graph import builder as transcript_analyzer_builder
+from ..trend_researcher.graph import builder as trend_researcher_builder
+from ..titling_agent.graph import builder as titling_agent_builder
+from ..models import get_model
+from ..search import run_searches
+
+# Subagents run inline inside a single node, so skip their nested checkpoints
+transcript_analyzer_graph = transcript_analyzer_builder.compile(checkpointer=False)
+trend_researcher_graph = trend_researcher_builder.compile(checkpointer=False)
+titling_agent_graph = titling_agent_builder.compile(checkpointer=False)
 
 
 class PackagerState(TypedDict):
@@ -34,19 +41,22 @@ class PackagerState(TypedDict):
     # Discovery
     guest_name: str
     transcript_id: str
+    transcript_content: str
 
     # Subagent outputs
     transcript_summary: dict
+    summary_from_batch: bool
+    guest_search_results: list
     trend_research: dict
     title_options: list
 
     # User selection
     selected_title: dict
 
-    # Generated content
+    # Generated content (each written by its own parallel branch)
     episode_description: str
-    lht_social_posts: dict
-    guest_social_posts: dict
+    lht_social_posts: Annotated[dict, operator.or_]
+    guest_social_posts: Annotated[dict, operator.or_]
 
     # Drive operations
     created_files: list
@@ -61,34 +71,69 @@ class PackagerState(TypedDict):
 
 
 # Load system prompt from file
+@functools.lru_cache(maxsize=1)
 def load_system_prompt() -> str:
     prompt_path = os.path.join(os.path.dirname(__file__), "../../main-packager/system_prompt.txt")
     with open(prompt_path, "r") as f:
         return f.read()
 
 
-# Initialize model
-model = ChatAnthropic(
-    model="claude-sonnet-4-20250514",
-    max_tokens=8192,
-)
+def cached_block(text: str) -> dict:
+    """Wrap text in a content block marked for Anthropic prompt caching."""
+    return {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+
+
+def preflight_dispatch(state: PackagerState) -> list[Send]:
+    """Fan out the independent Google Drive lookups for preflight and discovery."""
+    return [
+        Send("drive_scan", state),
+        Send("fetch_transcript_doc", state),
+        Send("extract_guest_name", state),
+    ]
 
 
-def preflight_check(state: PackagerState) -> PackagerState:
-    """Phase 0: Check if episode is new or already packaged."""
+async def drive_scan(state: PackagerState) -> dict:
+    """Phase 0a: Scan the episode folder for existing packaging."""
     # TODO: Implement Google Drive folder scanning using MCP tools
     # - list_drive_items to scan folder
     # - Check if transcript is in root or Full Length Assets
 
     # Placeholder logic
     return {
-        **state,
-        "current_phase": "preflight",
         "packaging_status": "new_episode",  # Would be determined by Drive scan
         "transcript_location": "root",
     }
 
 
+async def fetch_transcript_doc(state: PackagerState) -> dict:
+    """Phase 0b: Find the transcript and read its content."""
+    # TODO: Implement using MCP tools
+    # - Find transcript in folder
+    # - get_doc_content to read transcript
+
+    return {
+        "transcript_id": "transcript_doc_id",
+        "transcript_content": "",  # Would be populated from Drive
+    }
+
+
+async def extract_guest_name(state: PackagerState) -> dict:
+    """Phase 0c: Extract guest name from the transcript filename."""
+    # TODO: Implement using MCP tools
+    # - list_drive_items to read the transcript filename
+
+    return {
+        "guest_name": "Guest Name",  # Would be extracted from transcript
+    }
+
+
+def preflight_check(state: PackagerState) -> dict:
+    """Phase 0: Fan-in once the Drive scan, transcript and guest name are in."""
+    return {
+        "current_phase": "preflight",
+    }
+
+
 def should_prompt_repackage(state: PackagerState) -> str:
     """Route based on preflight check results."""
     if state["packaging_status"] == "already_packaged":
@@ -98,7 +143,7 @@ def should_prompt_repackage(state: PackagerState) -> str:
     return "discovery"
 
 
-def prompt_repackage(state: PackagerState) -> PackagerState:
+def prompt_repackage(state: PackagerState) -> dict:
     """Interrupt for user decision on re-packaging."""
     decision = interrupt({
         "type": "repackage_decision",
@@ -107,7 +152,6 @@ def prompt_repackage(state: PackagerState) -> PackagerState:
     })
 
     return {
-        **state,
         "user_decision": decision,
     }
 
@@ -119,7 +163,7 @@ def should_continue_after_decision(state: PackagerState) -> str:
     return "archive"
 
 
-def archive_previous(state: PackagerState) -> PackagerState:
+def archive_previous(state: PackagerState) -> dict:
     """Archive existing generated files before re-packaging."""
     # TODO: Implement archive logic using MCP tools
     # - Create _Archive folder if not exists
@@ -127,91 +171,130 @@ def archive_previous(state: PackagerState) -> PackagerState:
     # - Delete existing shortcuts in Guest Package
 
     return {
-        **state,
         "current_phase": "archive",
         "archived_files": [],  # Would be populated by actual operations
     }
 
 
-def discovery(state: PackagerState) -> PackagerState:
-    """Phase 1: Extract guest name and confirm transcript."""
+def discovery(state: PackagerState) -> dict:
+    """Phase 1: Confirm transcript and guest name gathered during preflight."""
     # TODO: Implement discovery using MCP tools
-    # - Find transcript in folder
-    # - Extract guest name from filename or content
+    # - Fall back to extracting guest name from transcript content
 
     return {
-        **state,
         "current_phase": "discovery",
-        "guest_name": "Guest Name",  # Would be extracted from transcript
-        "transcript_id": "transcript_doc_id",
     }
 
 
-def analyze_transcript(state: PackagerState) -> PackagerState:
-    """Phase 2: Invoke Transcript Analyzer subagent."""
-    result = transcript_analyzer_graph.invoke({
+def parallel_dispatch(state: PackagerState) -> list[Send]:
+    """Fan out transcript analysis and guest-keyed trend prefetch concurrently."""
+    return [
+        Send("analyze", state),
+        Send("prefetch_trends", state),
+    ]
+
+
+def analyzer_input(state: PackagerState) -> dict:
+    """Build the Transcript Analyzer subagent input from packager state."""
+    return {
         "folder_id": state["folder_id"],
+        "document_id": state["transcript_id"],
         "user_email": state["user_email"],
-    })
+        "transcript_content": state["transcript_content"],
+    }
+
+
+async def analyze_transcript(state: PackagerState) -> dict:
+    """Phase 2: Invoke Transcript Analyzer subagent."""
+    # Batch runs arrive with the summary already produced via the Message Batches API
+    if state.get("summary_from_batch"):
+        return {
+            "current_phase": "analyze",
+            "summary_from_batch": False,
+        }
+
+    result = await transcript_analyzer_graph.ainvoke(analyzer_input(state))
 
     return {
-        **state,
         "current_phase": "analyze",
         "transcript_summary": result,
     }
 
 
-def research_trends(state: PackagerState) -> PackagerState:
+async def prefetch_trends(state: PackagerState) -> dict:
+    """Phase 2b: Run guest-keyed trend searches while the transcript is analyzed."""
+    guest_name = state["guest_name"]
+    search_queries = [
+        f"{guest_name} education",
+        f"{guest_name} LinkedIn",
+    ]
+
+    results = await run_searches(search_queries)
+
+    return {
+        "guest_search_results": results,
+    }
+
+
+def join(state: PackagerState) -> dict:
+    """Fan-in: wait for transcript analysis and trend prefetch before research."""
+    return {
+        "current_phase": "analyze",
+    }
+
+
+async def research_trends(state: PackagerState) -> dict:
     """Phase 3: Invoke Trend Researcher subagent."""
-    result = trend_researcher_graph.invoke({
+    result = await trend_researcher_graph.ainvoke({
         "transcript_summary": state["transcript_summary"],
+        "search_results": state["guest_search_results"],
     })
 
     return {
-        **state,
         "current_phase": "research",
         "trend_research": result,
     }
 
 
-def generate_titles(state: PackagerState) -> PackagerState:
+async def generate_titles(state: PackagerState) -> dict:
     """Phase 4: Invoke Titling Agent subagent and present options."""
-    result = titling_agent_graph.invoke({
+    result = await titling_agent_graph.ainvoke({
         "transcript_summary": state["transcript_summary"],
         "trend_research": state["trend_research"],
     })
 
     return {
-        **state,
         "current_phase": "titles",
-        "title_options": result.get("titles", []),
+        "title_options": result["titles_result"].get("titles", []),
     }
 
 
-def title_selection(state: PackagerState) -> PackagerState:
+def title_selection(state: PackagerState) -> dict:
     """Phase 4b: Human-in-the-loop title selection."""
-    titles_display = "\n".join([
-        f"{i+1}. {t['title']} - {t['strategy']}\n   {t['rationale']}"
-        for i, t in enumerate(state["title_options"])
-    ])
-
+    # The frontend renders the options; the message stays static so the
+    # titles are not serialized into the checkpoint twice
     selection = interrupt({
         "type": "title_selection",
-        "message": f"Based on transcript analysis and current social media trends, here are 5 title options:\n\n{titles_display}\n\nWhich title would you like to use, or do you have another suggestion?",
+        "message": "Based on transcript analysis and current social media trends, here are 5 title options.\n\nWhich title would you like to use, or do you have another suggestion?",
         "options": state["title_options"],
         "allowed_decisions": ["approve", "edit", "reject"],
     })
 
     return {
-        **state,
         "selected_title": selection,
     }
 
 
-def create_content(state: PackagerState) -> PackagerState:
-    """Phase 5: Generate all marketing content using selected title."""
-    system_prompt = load_system_prompt()
+def content_dispatch(state: PackagerState) -> list[Send]:
+    """Fan out the social post generators once the episode description is written."""
+    return [
+        Send("gen_lht_social", state),
+        Send("gen_guest_social", state),
+    ]
+
 
+def content_messages(state: PackagerState, instructions: str) -> list:
+    """Build a content prompt: shared cacheable prefix plus per-output instructions."""
     # Build context from all subagent outputs
     context = {
         "transcript_summary": state["transcript_summary"],
@@ -220,56 +303,66 @@ def create_content(state: PackagerState) -> PackagerState:
         "guest_name": state["guest_name"],
     }
 
-    # Generate Episode Description
-    response = model.invoke([
-        SystemMessage(content=system_prompt),
-        HumanMessage(content=f"""Generate the Episode Description using this context:
+    # System prompt and context are identical across the three generators, so
+    # mark them as a cacheable prefix and vary only the trailing instructions.
+    # A cache entry is only readable once the first response starts, which is
+    # why the episode description runs ahead of the two social generators.
+    return [
+        SystemMessage(content=[cached_block(load_system_prompt())]),
+        HumanMessage(content=[
+            cached_block(f"Context:\n{orjson.dumps(context).decode()}"),
+            {"type": "text", "text": instructions},
+        ]),
+    ]
+
 
-{json.dumps(context, indent=2)}
+async def generate_episode_description(state: PackagerState) -> dict:
+    """Phase 5: Generate the Episode Description using selected title."""
+    response = await get_model().ainvoke(content_messages(state, """Generate the Episode Description using the context above.
 
 Follow the Episode Description format from the system prompt exactly.
 Use the selected title as the header.
-NO EMOJIS. NO ASTERISKS.""")
-    ])
-    episode_description = response.content
+NO EMOJIS. NO ASTERISKS."""))
+
+    return {
+        "episode_description": response.content,
+    }
 
-    # Generate LHT Social Posts (4 platforms)
-    response = model.invoke([
-        SystemMessage(content=system_prompt),
-        HumanMessage(content=f"""Generate LHT Social Posts for LinkedIn, Facebook, TikTok, and Instagram using this context:
 
-{json.dumps(context, indent=2)}
+async def generate_lht_social_posts(state: PackagerState) -> dict:
+    """Phase 5: Generate LHT Social Posts (4 platforms)."""
+    response = await get_model().ainvoke(content_messages(state, """Generate LHT Social Posts for LinkedIn, Facebook, TikTok, and Instagram using the context above.
 
 Follow platform-specific formats from the system prompt.
 All posts must tie back to the selected title theme.
-NO EMOJIS. NO ASTERISKS.""")
-    ])
-    lht_social_posts = {"content": response.content}
+NO EMOJIS. NO ASTERISKS."""))
 
-    # Generate Guest Social Posts (in guest's voice)
-    response = model.invoke([
-        SystemMessage(content=system_prompt),
-        HumanMessage(content=f"""Generate Guest Social Posts for {state['guest_name']} to post on their own LinkedIn, Facebook, TikTok, and Instagram.
+    return {
+        "lht_social_posts": {"content": response.content},
+    }
 
-Context:
-{json.dumps(context, indent=2)}
+
+async def generate_guest_social_posts(state: PackagerState) -> dict:
+    """Phase 5: Generate Guest Social Posts (in guest's voice)."""
+    response = await get_model().ainvoke(content_messages(state, f"""Generate Guest Social Posts for {state['guest_name']} to post on their own LinkedIn, Facebook, TikTok, and Instagram.
 
 Use the guest's voice profile from transcript_summary.
 Write as if the guest is posting these themselves.
-NO EMOJIS. NO ASTERISKS.""")
-    ])
-    guest_social_posts = {"content": response.content}
+NO EMOJIS. NO ASTERISKS."""))
+
+    return {
+        "guest_social_posts": {"content": response.content},
+    }
 
+
+def create_content(state: PackagerState) -> dict:
+    """Phase 5b: Fan-in once all marketing content has been generated."""
     return {
-        **state,
         "current_phase": "content",
-        "episode_description": episode_description,
-        "lht_social_posts": lht_social_posts,
-        "guest_social_posts": guest_social_posts,
     }
 
 
-def drive_output(state: PackagerState) -> PackagerState:
+def drive_output(state: PackagerState) -> dict:
     """Phase 6: Create folders, docs, and organize files in Google Drive."""
     # TODO: Implement using MCP tools:
     # - create_drive_file for folders
@@ -292,14 +385,13 @@ def drive_output(state: PackagerState) -> PackagerState:
     ]
 
     return {
-        **state,
         "current_phase": "output",
         "created_folders": created_folders,
         "created_files": created_files,
     }
 
 
-def organize_files(state: PackagerState) -> PackagerState:
+def organize_files(state: PackagerState) -> dict:
     """Phase 6b: Move files and create shortcuts."""
     # TODO: Implement file organization using MCP tools
     # - Move media files to Full Length Assets
@@ -308,16 +400,14 @@ def organize_files(state: PackagerState) -> PackagerState:
     # - Create shortcuts in Guest Package
 
     return {
-        **state,
         "moved_files": [],
         "created_shortcuts": [],
     }
 
 
-def deliver(state: PackagerState) -> PackagerState:
+def deliver(state: PackagerState) -> dict:
     """Phase 7: Final delivery summary."""
     return {
-        **state,
         "current_phase": "complete",
     }
 
@@ -326,34 +416,50 @@ def deliver(state: PackagerState) -> PackagerState:
 builder = StateGraph(PackagerState)
 
 # Add nodes
+builder.add_node("drive_scan", drive_scan)
+builder.add_node("fetch_transcript_doc", fetch_transcript_doc)
+builder.add_node("extract_guest_name", extract_guest_name)
 builder.add_node("preflight", preflight_check)
 builder.add_node("prompt_repackage", prompt_repackage)
 builder.add_node("archive", archive_previous)
 builder.add_node("discovery", discovery)
 builder.add_node("analyze", analyze_transcript)
+builder.add_node("prefetch_trends", prefetch_trends)
+builder.add_node("join", join)
 builder.add_node("research", research_trends)
 builder.add_node("titles", generate_titles)
 builder.add_node("title_selection", title_selection)
+builder.add_node("gen_episode", generate_episode_description)
+builder.add_node("gen_lht_social", generate_lht_social_posts)
+builder.add_node("gen_guest_social", generate_guest_social_posts)
 builder.add_node("content", create_content)
 builder.add_node("output", drive_output)
 builder.add_node("organize", organize_files)
 builder.add_node("deliver", deliver)
 
 # Add edges
-builder.add_edge(START, "preflight")
+builder.add_conditional_edges(
+    START,
+    preflight_dispatch,
+    ["drive_scan", "fetch_transcript_doc", "extract_guest_name"],
+)
+builder.add_edge(["drive_scan", "fetch_transcript_doc", "extract_guest_name"], "preflight")
 builder.add_conditional_edges("preflight", should_prompt_repackage)
 builder.add_conditional_edges("prompt_repackage", should_continue_after_decision)
 builder.add_edge("archive", "discovery")
-builder.add_edge("discovery", "analyze")
-builder.add_edge("analyze", "research")
+builder.add_conditional_edges("discovery", parallel_dispatch, ["analyze", "prefetch_trends"])
+builder.add_edge(["analyze", "prefetch_trends"], "join")
+builder.add_edge("join", "research")
 builder.add_edge("research", "titles")
 builder.add_edge("titles", "title_selection")
-builder.add_edge("title_selection", "content")
+builder.add_edge("title_selection", "gen_episode")
+builder.add_conditional_edges("gen_episode", content_dispatch, ["gen_lht_social", "gen_guest_social"])
+builder.add_edge(["gen_lht_social", "gen_guest_social"], "content")
 builder.add_edge("content", "output")
 builder.add_edge("output", "organize")
 builder.add_edge("organize", "deliver")
 builder.add_edge("deliver", END)
 
-# Compile with checkpointer for HITL support
-checkpointer = MemorySaver()
-graph = builder.compile(checkpointer=checkpointer)
+# The runtime attaches the checkpointer needed for HITL support
+# (LangGraph Platform, or server.py's lifespan)
+graph = builder.compile()
@@ -0,0 +1,19 @@
+"""
+Shared Chat Model
+
+One ChatAnthropic instance used by every agent graph, so all model calls
+in the process go through a single pooled Anthropic HTTP client. It is
+built on first use, so runs that never reach an LLM step (e.g. a
+cancelled re-package) never construct the client.
+"""
+
+from langchain_anthropic import ChatAnthropic
+import functools
+
+
+@functools.cache
+def get_model() -> ChatAnthropic:
+    return ChatAnthropic(
+        model="claude-sonnet-4-20250514",
+        max_tokens=8192,
+    )
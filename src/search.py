@@ -0,0 +1,96 @@
+"""
+Shared Web Search
+
+Web search used by the research subagents, backed by an on-disk cache so
+evergreen queries are not re-fetched on every pipeline run.
+"""
+
+from langchain_community.utilities.tavily_search import TavilySearchAPIWrapper
+import asyncio
+import diskcache
+import functools
+import hashlib
+import os
+import re
+
+
+# Search results change slowly; 48h keeps them fresh enough for weekly episodes
+SEARCH_CACHE_DIR = os.getenv("SEARCH_CACHE_DIR", "./.search_cache")
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", str(48 * 60 * 60)))
+SEARCH_MAX_RESULTS = 5
+
+# Function words that do not change what a search returns
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "at", "by", "for", "from", "in", "is", "of", "on",
+    "or", "the", "to", "with",
+})
+
+
+# Clients are built on first search so runs that never research skip them
+@functools.cache
+def get_search() -> TavilySearchAPIWrapper:
+    return TavilySearchAPIWrapper()
+
+
+@functools.cache
+def get_cache() -> diskcache.Cache:
+    return diskcache.Cache(SEARCH_CACHE_DIR)
+
+
+def normalize_query(query: str) -> str:
+    """Reduce a query to a canonical form so trivially different queries share a cache key.
+
+    Only case, punctuation and function words are dropped; word order and
+    word forms are kept, since a wrong match is served from cache for hours.
+    """
+    words = [
+        word for word in re.findall(r"[a-z0-9]+", query.lower()) if word not in STOPWORDS
+    ]
+    # Queries made only of stopwords would otherwise all share the empty key
+    return " ".join(words) or query.lower().strip()
+
+
+def cached_search(query: str) -> list[dict]:
+    """Run a web search, reusing a cached result when one is available.
+
+    Results come back from the API already structured, so they are kept as
+    title/url/content dicts and passed to the model as JSON without parsing.
+    """
+    # Namespaced by provider so text results cached before the switch are ignored
+    key = hashlib.sha256(f"tavily:{normalize_query(query)}".encode()).hexdigest()
+    cache = get_cache()
+    result = cache.get(key)
+    if result is None:
+        # "basic" depth costs one API credit per query; the default "advanced" costs two
+        hits = get_search().results(
+            query, max_results=SEARCH_MAX_RESULTS, search_depth="basic"
+        )
+        result = [
+            {"title": hit["title"], "url": hit["url"], "content": hit["content"]}
+            for hit in hits
+        ]
+        cache.set(key, result, expire=SEARCH_CACHE_TTL)
+    return result
+
+
+async def run_searches(queries: list[str]) -> list[dict]:
+    """Run searches concurrently, recording each as a result or an error."""
+    # Near-duplicate queries in the same batch are only searched once
+    unique_queries = {}
+    for query in queries:
+        unique_queries.setdefault(normalize_query(query), query)
+
+    results_raw = await asyncio.gather(
+        *[asyncio.to_thread(cached_search, query) for query in unique_queries.values()],
+        return_exceptions=True,
+    )
+    results_by_key = dict(zip(unique_queries, results_raw))
+
+    results = []
+    for query in queries:
+        result = results_by_key[normalize_query(query)]
+        if isinstance(result, Exception):
+            results.append({"query": query, "error": str(result)})
+        else:
+            results.append({"query": query, "result": result})
+    return results
@@ -3,37 +3,82 @@ Lightweight FastAPI server for podcast packager agents.
 Self-hosted alternative to LangGraph Platform.
 """
 
+import asyncio
+import copy
+import json
+import logging
 import os
 import uuid
 from typing import Any, Optional
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.errors import GraphInterrupt
+from langgraph.types import Command
+
+from src.batch import run_analysis_batch
+from src.checkpointer import QueuedSaver
 
 # Import graphs
-from src.main_packager.graph import graph as main_graph, PackagerState
-from src.transcript_analyzer.graph import graph as transcript_graph
-from src.trend_researcher.graph import graph as trend_graph
-from src.titling_agent.graph import graph as titling_graph
+from src.main_packager.graph import builder as main_builder, analyzer_input, PackagerState
+from src.transcript_analyzer.graph import builder as transcript_builder
+from src.trend_researcher.graph import builder as trend_builder
+from src.titling_agent.graph import builder as titling_builder
 
 
 # Database setup
 DATABASE_URI = os.getenv("DATABASE_URI", os.getenv("POSTGRES_URI", ""))
 
+logger = logging.getLogger(__name__)
+
+# Background batch completions, held so they are not garbage collected mid-run
+batch_tasks: set[asyncio.Task] = set()
+
+
+# Uncompiled graphs, keyed by assistant ID
+BUILDERS = {
+    "podcast-packager": main_builder,
+    "transcript-analyzer": transcript_builder,
+    "trend-researcher": trend_builder,
+    "titling-agent": titling_builder,
+}
+
+
+def compile_graphs(app: FastAPI, checkpointer) -> None:
+    """Compile every assistant once against the shared checkpointer."""
+    app.state.checkpointer = checkpointer
+    app.state.compiled = {
+        assistant_id: builder.compile(checkpointer=checkpointer)
+        for assistant_id, builder in BUILDERS.items()
+    }
+
+
+async def cancel_batch_tasks() -> None:
+    """Stop background batch completions so none write after the checkpointer closes."""
+    for task in batch_tasks:
+        task.cancel()
+    await asyncio.gather(*batch_tasks, return_exceptions=True)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Setup and teardown."""
     if DATABASE_URI:
-        async with AsyncPostgresSaver.from_conn_string(DATABASE_URI) as checkpointer:
+        async with QueuedSaver.from_conn_string(DATABASE_URI) as checkpointer:
             await checkpointer.setup()
-            app.state.checkpointer = checkpointer
+            compile_graphs(app, checkpointer)
             yield
+            await cancel_batch_tasks()
+            # Persist any checkpoints still queued before the connection closes
+            await checkpointer.flush()
     else:
-        app.state.checkpointer = None
+        # In-memory checkpoints keep HITL interrupts working for local runs
+        compile_graphs(app, MemorySaver())
         yield
+        await cancel_batch_tasks()
 
 
 app = FastAPI(
@@ -62,10 +107,21 @@ class RunResponse(BaseModel):
     """Response from agent run."""
     thread_id: str
     state: dict[str, Any]
-    status: str  # "completed", "interrupted", "error"
+    status: str  # "completed", "interrupted", "batched", "error"
     interrupt_value: Optional[Any] = None
 
 
+class BatchRunRequest(BaseModel):
+    """Request to run the packager over several episodes."""
+    inputs: list[dict[str, Any]]
+    config: Optional[dict[str, Any]] = None
+
+
+class BatchRunResponse(BaseModel):
+    """Response from a batch packager run."""
+    runs: list[RunResponse]
+
+
 @app.get("/health")
 async def health():
     """Health check endpoint."""
@@ -102,118 +158,199 @@ async def list_assistants():
 
 
 def get_graph(assistant_id: str):
-    """Get the graph for an assistant."""
-    graphs = {
-        "podcast-packager": main_graph,
-        "transcript-analyzer": transcript_graph,
-        "trend-researcher": trend_graph,
-        "titling-agent": titling_graph,
-    }
+    """Get the compiled graph for an assistant."""
+    graphs = app.state.compiled
     if assistant_id not in graphs:
         raise HTTPException(status_code=404, detail=f"Assistant '{assistant_id}' not found")
     return graphs[assistant_id]
 
 
+async def interrupted_response(compiled, config: dict, thread_id: str) -> RunResponse:
+    """Build the response for a run paused at a human-in-the-loop interrupt."""
+    state = await compiled.aget_state(config)
+    # The interrupt payloads carry the type, options and allowed decisions the
+    # frontend renders, rather than just the paused node names
+    interrupts = [
+        interrupt.value for task in state.tasks for interrupt in task.interrupts
+    ]
+    return RunResponse(
+        thread_id=thread_id,
+        state=state.values,
+        status="interrupted",
+        interrupt_value=interrupts,
+    )
+
+
 @app.post("/assistants/{assistant_id}/runs", response_model=RunResponse)
 async def run_assistant(assistant_id: str, request: RunRequest):
     """Run an assistant with the given input."""
-    graph = get_graph(assistant_id)
+    compiled = get_graph(assistant_id)
 
     thread_id = request.thread_id or str(uuid.uuid4())
     config = request.config or {}
     config["configurable"] = config.get("configurable", {})
     config["configurable"]["thread_id"] = thread_id
 
-    # Add checkpointer if available
-    checkpointer = getattr(app.state, "checkpointer", None)
-    if checkpointer:
-        compiled = graph.compile(checkpointer=checkpointer)
-    else:
-        compiled = graph
-
     try:
         # Run the graph
         result = await compiled.ainvoke(request.input, config)
-
-        return RunResponse(
-            thread_id=thread_id,
-            state=result,
-            status="completed",
-        )
+    except GraphInterrupt:
+        return await interrupted_response(compiled, config, thread_id)
     except Exception as e:
-        # Check if it's an interrupt
-        if "interrupt" in str(e).lower():
-            # Get current state for interrupt value
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if "__interrupt__" in result:
+        return await interrupted_response(compiled, config, thread_id)
+
+    return RunResponse(
+        thread_id=thread_id,
+        state=result,
+        status="completed",
+    )
+
+
+@app.post("/assistants/{assistant_id}/runs/stream")
+async def stream_assistant(assistant_id: str, request: RunRequest):
+    """Run an assistant, streaming title options as Server-Sent Events."""
+    compiled = get_graph(assistant_id)
+
+    thread_id = request.thread_id or str(uuid.uuid4())
+    config = request.config or {}
+    config["configurable"] = config.get("configurable", {})
+    config["configurable"]["thread_id"] = thread_id
+
+    async def event_stream():
+        try:
+            async for event in compiled.astream_events(request.input, config, version="v2"):
+                if event["event"] == "on_custom_event":
+                    yield f"event: {event['name']}\ndata: {json.dumps(event['data'])}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+            return
+        # Final state is available via GET /threads/{thread_id}
+        yield f"event: end\ndata: {json.dumps({'thread_id': thread_id})}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+async def complete_batch(compiled, configs: dict[str, dict], transcripts: dict[str, str]):
+    """Resume batched runs once their transcript analyses are back."""
+    try:
+        analyses = await run_analysis_batch(transcripts)
+    except Exception:
+        # Resume without summaries; the analyze node falls back to a live call
+        logger.exception("Analysis batch failed, resuming threads with live analysis")
+        analyses = {}
+
+    async def resume(thread_id: str, config: dict):
+        resume_input = None
+        if thread_id in analyses:
             state = await compiled.aget_state(config)
-            return RunResponse(
-                thread_id=thread_id,
-                state=state.values if state else {},
-                status="interrupted",
-                interrupt_value=getattr(state, "next", None),
+            summary = {**analyzer_input(state.values), "analysis_result": analyses[thread_id]}
+            resume_input = Command(
+                update={"transcript_summary": summary, "summary_from_batch": True}
             )
-        raise HTTPException(status_code=500, detail=str(e))
+        await compiled.ainvoke(resume_input, config)
+
+    results = await asyncio.gather(
+        *[resume(thread_id, config) for thread_id, config in configs.items()],
+        return_exceptions=True,
+    )
+    for thread_id, result in zip(configs, results):
+        if isinstance(result, Exception):
+            logger.error("Failed to resume batched thread %s", thread_id, exc_info=result)
+
+
+@app.post("/assistants/podcast-packager/runs/batch", response_model=BatchRunResponse)
+async def run_packager_batch(request: BatchRunRequest):
+    """Run the packager for several episodes, analyzing transcripts in one batch.
+
+    Each run pauses before discovery while its transcript goes through the
+    Anthropic Message Batches API, then resumes in the background up to
+    title selection. Poll GET /threads/{thread_id} for progress.
+
+    The batch is tracked in process memory only. If the server restarts before
+    it ends, its threads stay paused before discovery; the batch ID is logged
+    at submission so its results can be retrieved and the threads resumed
+    by hand.
+    """
+    compiled = get_graph("podcast-packager")
+
+    async def start(run_input: dict) -> tuple[RunResponse, dict]:
+        thread_id = str(uuid.uuid4())
+        config = copy.deepcopy(request.config or {})
+        config["configurable"] = config.get("configurable", {})
+        config["configurable"]["thread_id"] = thread_id
+
+        try:
+            await compiled.ainvoke(run_input, config, interrupt_before=["discovery"])
+        except GraphInterrupt:
+            # Some LangGraph versions raise on interrupt; the state check below classifies it
+            pass
+        except Exception as e:
+            return RunResponse(thread_id=thread_id, state={"error": str(e)}, status="error"), config
+
+        state = await compiled.aget_state(config)
+        if state.next == ("discovery",):
+            return RunResponse(thread_id=thread_id, state=state.values, status="batched"), config
+        if state.next:
+            return await interrupted_response(compiled, config, thread_id), config
+        return RunResponse(thread_id=thread_id, state=state.values, status="completed"), config
+
+    started = await asyncio.gather(*[start(run_input) for run_input in request.inputs])
+
+    configs = {
+        run.thread_id: config for run, config in started if run.status == "batched"
+    }
+    if configs:
+        transcripts = {
+            run.thread_id: run.state["transcript_content"]
+            for run, _ in started if run.status == "batched"
+        }
+        task = asyncio.create_task(complete_batch(compiled, configs, transcripts))
+        batch_tasks.add(task)
+        task.add_done_callback(batch_tasks.discard)
+
+    return BatchRunResponse(runs=[run for run, _ in started])
 
 
 @app.post("/threads/{thread_id}/resume", response_model=RunResponse)
 async def resume_thread(thread_id: str, request: ResumeRequest):
     """Resume an interrupted thread with user response."""
     # For now, resume the main packager (most common use case)
-    graph = main_graph
+    compiled = get_graph("podcast-packager")
 
     config = request.config or {}
     config["configurable"] = config.get("configurable", {})
     config["configurable"]["thread_id"] = thread_id
 
-    checkpointer = getattr(app.state, "checkpointer", None)
-    if checkpointer:
-        compiled = graph.compile(checkpointer=checkpointer)
-    else:
-        raise HTTPException(
-            status_code=400,
-            detail="Cannot resume without checkpointer. Configure DATABASE_URI."
-        )
-
     try:
-        # Resume with the response
-        result = await compiled.ainvoke(
-            None,  # No new input, resume from checkpoint
-            config,
-            # Pass the user's response through command
-        )
-
-        return RunResponse(
-            thread_id=thread_id,
-            state=result,
-            status="completed",
-        )
+        # Resume from checkpoint, delivering the user's response to the interrupt
+        result = await compiled.ainvoke(Command(resume=request.response), config)
+    except GraphInterrupt:
+        return await interrupted_response(compiled, config, thread_id)
     except Exception as e:
-        if "interrupt" in str(e).lower():
-            state = await compiled.aget_state(config)
-            return RunResponse(
-                thread_id=thread_id,
-                state=state.values if state else {},
-                status="interrupted",
-                interrupt_value=getattr(state, "next", None),
-            )
         raise HTTPException(status_code=500, detail=str(e))
 
+    if "__interrupt__" in result:
+        return await interrupted_response(compiled, config, thread_id)
+
+    return RunResponse(
+        thread_id=thread_id,
+        state=result,
+        status="completed",
+    )
+
 
 @app.get("/threads/{thread_id}")
 async def get_thread_state(thread_id: str):
     """Get the current state of a thread."""
-    checkpointer = getattr(app.state, "checkpointer", None)
-    if not checkpointer:
-        raise HTTPException(
-            status_code=400,
-            detail="Cannot get thread state without checkpointer. Configure DATABASE_URI."
-        )
-
     # Use main graph for state retrieval
-    compiled = main_graph.compile(checkpointer=checkpointer)
+    compiled = get_graph("podcast-packager")
     config = {"configurable": {"thread_id": thread_id}}
 
     state = await compiled.aget_state(config)
-    if not state:
+    if not state.values:
         raise HTTPException(status_code=404, detail=f"Thread '{thread_id}' not found")
 
     return {
@@ -7,12 +7,16 @@ marketing psychology, and platform-specific optimization.
 
 from typing import TypedDict
 from langgraph.graph import StateGraph, START, END
-from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_community.tools import DuckDuckGoSearchRun
+from langchain_core.callbacks import adispatch_custom_event
+import functools
 import json
+import orjson
 import os
 
+from ..models import get_model
+from ..search import run_searches
+
 
 class TitlingState(TypedDict):
     """State schema for title generation."""
@@ -22,21 +26,26 @@ class TitlingState(TypedDict):
     titles_result: dict
 
 
+@functools.lru_cache(maxsize=1)
 def load_system_prompt() -> str:
     prompt_path = os.path.join(os.path.dirname(__file__), "../../titling-agent/system_prompt.txt")
     with open(prompt_path, "r") as f:
         return f.read()
 
 
-model = ChatAnthropic(
-    model="claude-sonnet-4-20250514",
-    max_tokens=8192,
-)
-
-search = DuckDuckGoSearchRun()
+@functools.lru_cache(maxsize=1)
+def load_output_schema() -> dict:
+    agent_path = os.path.join(os.path.dirname(__file__), "../../titling-agent/agent.json")
+    with open(agent_path, "r") as f:
+        output_schema = json.load(f)["output_schema"]
+    return {
+        "title": "title_options",
+        "description": "Ranked title options with supporting research.",
+        **output_schema,
+    }
 
 
-def research_strategies(state: TitlingState) -> TitlingState:
+async def research_strategies(state: TitlingState) -> dict:
     """Research current title strategies."""
     search_queries = [
         "viral podcast titles 2025",
@@ -47,48 +56,47 @@ def research_strategies(state: TitlingState) -> TitlingState:
         "education content marketing headlines",
     ]
 
-    results = []
-    for query in search_queries:
-        try:
-            result = search.run(query)
-            results.append({"query": query, "result": result})
-        except Exception as e:
-            results.append({"query": query, "error": str(e)})
+    results = await run_searches(search_queries)
 
     return {
-        **state,
         "strategy_research": results,
     }
 
 
-def generate_titles(state: TitlingState) -> TitlingState:
-    """Generate 5 titles using different strategies."""
+async def generate_titles(state: TitlingState) -> dict:
+    """Generate 5 titles using different strategies, emitting each as it completes."""
     system_prompt = load_system_prompt()
 
-    response = model.invoke([
+    # Structured output streams progressively more complete partial results
+    structured_model = get_model().with_structured_output(load_output_schema())
+    result = {}
+    emitted = 0
+    async for result in structured_model.astream([
         SystemMessage(content=system_prompt),
         HumanMessage(content=f"""Generate 5 title options using this context:
 
 Transcript Summary:
-{json.dumps(state['transcript_summary'], indent=2)}
+{orjson.dumps(state['transcript_summary']).decode()}
 
 Trend Research:
-{json.dumps(state['trend_research'], indent=2)}
+{orjson.dumps(state['trend_research']).decode()}
 
 Strategy Research:
-{json.dumps(state['strategy_research'], indent=2)}
+{orjson.dumps(state['strategy_research']).decode()}
+
+Each title must use a different strategy (FOMO, Reversal, Challenge, Curiosity Gap, Authority/Transformation).""")
+    ]):
+        titles = result.get("titles", [])
 
-Each title must use a different strategy (FOMO, Reversal, Challenge, Curiosity Gap, Authority/Transformation).
-Return ONLY valid JSON matching the output_schema from agent.json.""")
-    ])
+        # A title is complete once the next one has started
+        for title in titles[emitted:-1]:
+            await adispatch_custom_event("title_option", title)
+            emitted += 1
 
-    try:
-        result = json.loads(response.content)
-    except json.JSONDecodeError:
-        result = {"error": "Failed to parse response as JSON", "raw": response.content}
+    for title in result.get("titles", [])[emitted:]:
+        await adispatch_custom_event("title_option", title)
 
     return {
-        **state,
         "titles_result": result,
     }
 
@@ -7,11 +7,14 @@ guest info, themes, quote bank, pain points, and voice profile.
 
 from typing import TypedDict
 from langgraph.graph import StateGraph, START, END
-from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_anthropic.chat_models import convert_to_anthropic_tool
+import functools
 import json
 import os
 
+from ..models import get_model
+
 
 class AnalyzerState(TypedDict):
     """State schema for transcript analysis."""
@@ -22,54 +25,84 @@ class AnalyzerState(TypedDict):
     analysis_result: dict
 
 
+@functools.lru_cache(maxsize=1)
 def load_system_prompt() -> str:
     prompt_path = os.path.join(os.path.dirname(__file__), "../../transcript-analyzer/system_prompt.txt")
     with open(prompt_path, "r") as f:
         return f.read()
 
 
-model = ChatAnthropic(
-    model="claude-sonnet-4-20250514",
-    max_tokens=8192,
-)
+@functools.lru_cache(maxsize=1)
+def load_output_schema() -> dict:
+    agent_path = os.path.join(os.path.dirname(__file__), "../../transcript-analyzer/agent.json")
+    with open(agent_path, "r") as f:
+        output_schema = json.load(f)["output_schema"]
+    # Title and description name the tool Claude is forced to call
+    return {
+        "title": "transcript_analysis",
+        "description": "Structured summary of a podcast transcript.",
+        **output_schema,
+    }
 
 
-def fetch_transcript(state: AnalyzerState) -> AnalyzerState:
+def fetch_transcript(state: AnalyzerState) -> dict:
     """Fetch transcript from Google Drive using MCP tools."""
+    # The orchestrator may already have read the transcript during preflight
+    if state.get("transcript_content"):
+        return {}
+
     # TODO: Implement using MCP tools:
     # - list_drive_items to find transcript if folder_id provided
     # - get_doc_content to read transcript
 
     return {
-        **state,
         "transcript_content": "",  # Would be populated from Drive
     }
 
 
-def analyze_transcript(state: AnalyzerState) -> AnalyzerState:
+def analysis_prompt(transcript_content: str) -> str:
+    return f"""Analyze this transcript and extract its structured data:
+
+{transcript_content}"""
+
+
+def analyze_transcript(state: AnalyzerState) -> dict:
     """Analyze transcript and extract structured data."""
     system_prompt = load_system_prompt()
 
-    response = model.invoke([
+    structured_model = get_model().with_structured_output(load_output_schema())
+    result = structured_model.invoke([
         SystemMessage(content=system_prompt),
-        HumanMessage(content=f"""Analyze this transcript and return structured JSON output:
-
-{state['transcript_content']}
-
-Return ONLY valid JSON matching the output_schema from agent.json.""")
+        HumanMessage(content=analysis_prompt(state["transcript_content"])),
     ])
 
-    try:
-        result = json.loads(response.content)
-    except json.JSONDecodeError:
-        result = {"error": "Failed to parse response as JSON", "raw": response.content}
-
     return {
-        **state,
         "analysis_result": result,
     }
 
 
+def analysis_batch_params(transcript_content: str) -> dict:
+    """Build Message Batches API params equivalent to analyze_transcript's call."""
+    model = get_model()
+    tool = convert_to_anthropic_tool(load_output_schema())
+    return {
+        "model": model.model,
+        "max_tokens": model.max_tokens,
+        "system": load_system_prompt(),
+        "messages": [{"role": "user", "content": analysis_prompt(transcript_content)}],
+        "tools": [tool],
+        "tool_choice": {"type": "tool", "name": tool["name"]},
+    }
+
+
+def parse_analysis_message(message) -> dict | None:
+    """Extract the structured analysis from a Message Batches API result."""
+    for block in message.content:
+        if block.type == "tool_use":
+            return block.input
+    return None
+
+
 # Build graph
 builder = StateGraph(AnalyzerState)
 builder.add_node("fetch", fetch_transcript)
@@ -7,12 +7,15 @@ by viral potential and algorithm favorability.
 
 from typing import TypedDict
 from langgraph.graph import StateGraph, START, END
-from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_community.tools import DuckDuckGoSearchRun
+import functools
 import json
+import orjson
 import os
 
+from ..models import get_model
+from ..search import run_searches
+
 
 class ResearcherState(TypedDict):
     """State schema for trend research."""
@@ -21,21 +24,26 @@ class ResearcherState(TypedDict):
     research_result: dict
 
 
+@functools.lru_cache(maxsize=1)
 def load_system_prompt() -> str:
     prompt_path = os.path.join(os.path.dirname(__file__), "../../trend-researcher/system_prompt.txt")
     with open(prompt_path, "r") as f:
         return f.read()
 
 
-model = ChatAnthropic(
-    model="claude-sonnet-4-20250514",
-    max_tokens=8192,
-)
-
-search = DuckDuckGoSearchRun()
+@functools.lru_cache(maxsize=1)
+def load_output_schema() -> dict:
+    agent_path = os.path.join(os.path.dirname(__file__), "../../trend-researcher/agent.json")
+    with open(agent_path, "r") as f:
+        output_schema = json.load(f)["output_schema"]
+    return {
+        "title": "trend_research",
+        "description": "Trend rankings and content strategy recommendations.",
+        **output_schema,
+    }
 
 
-def conduct_research(state: ResearcherState) -> ResearcherState:
+async def conduct_research(state: ResearcherState) -> dict:
     """Execute web searches for trend research."""
     transcript = state["transcript_summary"]
     themes = transcript.get("key_themes", [])
@@ -54,45 +62,34 @@ def conduct_research(state: ResearcherState) -> ResearcherState:
         "education policy news January 2025",
     ]
 
-    results = []
-    for query in search_queries[:8]:  # Minimum 8 searches
-        try:
-            result = search.run(query)
-            results.append({"query": query, "result": result})
-        except Exception as e:
-            results.append({"query": query, "error": str(e)})
+    # Seeded with any guest-keyed results the orchestrator prefetched
+    results = list(state.get("search_results", []))
+    results.extend(await run_searches(search_queries[:8]))  # Minimum 8 searches
 
     return {
-        **state,
         "search_results": results,
     }
 
 
-def analyze_trends(state: ResearcherState) -> ResearcherState:
+def analyze_trends(state: ResearcherState) -> dict:
     """Analyze search results and rank transcript data."""
     system_prompt = load_system_prompt()
 
-    response = model.invoke([
+    structured_model = get_model().with_structured_output(load_output_schema())
+    result = structured_model.invoke([
         SystemMessage(content=system_prompt),
         HumanMessage(content=f"""Based on this transcript summary:
 
-{json.dumps(state['transcript_summary'], indent=2)}
+{orjson.dumps(state['transcript_summary']).decode()}
 
 And these search results:
 
-{json.dumps(state['search_results'], indent=2)}
+{orjson.dumps(state['search_results']).decode()}
 
-Rank the transcript data by trend potential and provide content strategy recommendations.
-Return ONLY valid JSON matching the output_schema from agent.json.""")
+Rank the transcript data by trend potential and provide content strategy recommendations.""")
     ])
 
-    try:
-        result = json.loads(response.content)
-    except json.JSONDecodeError:
-        result = {"error": "Failed to parse response as JSON", "raw": response.content}
-
     return {
-        **state,
         "research_result": result,
     }
 
@@ -0,0 +1,109 @@
+"""Tests for the queued Postgres checkpointer, with the database calls faked."""
+
+import asyncio
+
+import pytest
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+
+from src.checkpointer import QueuedSaver
+
+
+@pytest.fixture
+def database(monkeypatch):
+    """Record what reaches Postgres.
+
+    Checkpoints listed in `fail` raise once; threads listed in `gates` block
+    until their event is set.
+    """
+    db = {"checkpoints": [], "writes": [], "fail": set(), "gates": {}}
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        await asyncio.sleep(0.01)
+        if gate := db["gates"].get(config["configurable"]["thread_id"]):
+            await gate.wait()
+        if checkpoint["id"] in db["fail"]:
+            db["fail"].discard(checkpoint["id"])
+            raise RuntimeError("db blip")
+        parent = config["configurable"].get("checkpoint_id")
+        db["checkpoints"].append((checkpoint["id"], parent, dict(new_versions)))
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        db["writes"].append((config["configurable"]["checkpoint_id"], task_id))
+
+    monkeypatch.setattr(AsyncPostgresSaver, "aput", aput)
+    monkeypatch.setattr(AsyncPostgresSaver, "aput_writes", aput_writes)
+    return db
+
+
+async def run_steps(
+    saver: QueuedSaver, ids: list[str], config: dict | None = None, thread_id: str = "t"
+) -> dict:
+    """Put a chain of checkpoints, each with one task write, as a run would."""
+    config = config or {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    for checkpoint_id in ids:
+        config = await saver.aput(config, {"id": checkpoint_id}, {}, {checkpoint_id: 1})
+        await saver.aput_writes(config, [("value", checkpoint_id)], f"task-{checkpoint_id}")
+        # Yield as the next node would, letting the writer pick up the slot
+        await asyncio.sleep(0)
+    return config
+
+
+async def test_coalesces_checkpoints_written_while_busy(database):
+    saver = QueuedSaver(conn=None)
+    await run_steps(saver, ["1", "2", "3", "4"])
+    await saver.flush()
+
+    # "1" was in flight while "2" and "3" were replaced by "4"
+    assert database["checkpoints"] == [
+        ("1", None, {"1": 1}),
+        ("4", "1", {"2": 1, "3": 1, "4": 1}),
+    ]
+    assert database["writes"] == [("1", "task-1"), ("4", "task-4")]
+    assert not saver._pending and not saver._writers
+
+
+async def test_failed_write_does_not_lose_later_checkpoints(database):
+    saver = QueuedSaver(conn=None)
+    database["fail"].add("1")
+    config = await run_steps(saver, ["0"])
+    await saver.flush()
+    await run_steps(saver, ["1", "2"], config)
+    await saver.flush()
+
+    # "2" links past the checkpoint that failed, and that checkpoint's writes are dropped
+    assert [row[:2] for row in database["checkpoints"]] == [("0", None), ("2", "0")]
+    assert database["writes"] == [("0", "task-0"), ("2", "task-2")]
+    assert not saver._pending and not saver._writers
+
+
+async def test_flush_writes_pending_checkpoints_without_a_writer(database):
+    saver = QueuedSaver(conn=None)
+    config = {"configurable": {"thread_id": "t", "checkpoint_ns": ""}}
+    saver._slot(("t", ""))["checkpoint"] = (config, {"id": "1"}, {}, {})
+    await saver.flush()
+
+    assert database["checkpoints"] == [("1", None, {})]
+
+
+async def test_flushing_a_thread_does_not_wait_on_other_threads(database):
+    saver = QueuedSaver(conn=None)
+    database["gates"]["slow"] = asyncio.Event()
+    await run_steps(saver, ["a1"], thread_id="slow")
+    await run_steps(saver, ["b1"], thread_id="fast")
+
+    await asyncio.wait_for(saver.flush("fast"), timeout=1)
+    assert [row[0] for row in database["checkpoints"]] == ["b1"]
+
+    database["gates"]["slow"].set()
+    await saver.flush()
+    assert [row[0] for row in database["checkpoints"]] == ["b1", "a1"]
+
+
+async def test_flush_forgets_lost_checkpoints(database):
+    saver = QueuedSaver(conn=None)
+    database["fail"].add("1")
+    await run_steps(saver, ["1"])
+    await saver.flush("t")
+
+    assert database["checkpoints"] == []
+    assert not saver._lost
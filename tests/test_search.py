@@ -0,0 +1,24 @@
+"""Tests for search query normalization."""
+
+from src.search import normalize_query
+
+
+def test_near_duplicates_share_a_key():
+    assert normalize_query("The TikTok trends for teachers?") == normalize_query(
+        "tiktok trends teachers"
+    )
+
+
+def test_distinct_queries_keep_distinct_keys():
+    assert normalize_query("remote work teacher burnout") != normalize_query(
+        "remote teacher burnout"
+    )
+    assert normalize_query("teachers use canvas") != normalize_query("teachers use canva")
+    assert normalize_query("how teachers plan") != normalize_query("what teachers plan")
+    assert normalize_query("SPED education news") != normalize_query("SPED education new")
+    assert normalize_query("teacher burnout") != normalize_query("burnout teacher")
+
+
+def test_stopword_only_queries_keep_distinct_keys():
+    assert normalize_query("the and of") == "the and of"
+    assert normalize_query("to be or not") != normalize_query("the and of")